@@ -1,26 +1,30 @@
 # PYTHONPATH=. streamlit run src/app.py
 # src/app.py
 import streamlit as st
-from src.database import get_db, SessionLocal
+from src.database import session_scope, DATA_DIR
 from src.models import Tree, TreeUpdate, Photo, Reminder, Species, Settings
-from sqlalchemy import func, desc, and_, create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import func, desc, and_, case, cast, select, create_engine, Integer
+from sqlalchemy.orm import sessionmaker, Session, selectinload, joinedload
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 import os
-import pandas as pd
-from PIL import Image
+import io
+import struct
+from PIL import Image, ImageOps
 import PIL.ExifTags
 import glob
 import shutil
 import json
-from zipfile import ZipFile
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
 from streamlit_extras.bottom_container import bottom
 from streamlit_extras.stateful_button import button as state_button
 from streamlit_extras.stylable_container import stylable_container
 from streamlit_extras.grid import grid
-import plotly.express as px
 import tempfile
 import uuid
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 def reset_form_states():
     """Reset all form-related session state variables"""
@@ -35,10 +39,10 @@ def reset_form_states():
 
 def export_bonsai_data(db, export_dir="exports"):
     """
-    Export all bonsai data and images to a structured directory
+    Export all bonsai data and images to a zip archive
     
     Parameters:
-    db (SessionLocal): Database session
+    db (Session): Database session
     export_dir (str): Base directory for exports
     
     Returns:
@@ -46,123 +50,118 @@ def export_bonsai_data(db, export_dir="exports"):
     """
     # Create timestamp for unique export
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    export_path = os.path.join(export_dir, f"bonsai_export_{timestamp}")
-    os.makedirs(export_path, exist_ok=True)
+    os.makedirs(export_dir, exist_ok=True)
+    zip_path = os.path.join(export_dir, f"bonsai_export_{timestamp}.zip")
+    
+    # Excel export with multiple sheets, streamed row by row as trees are read
+    from openpyxl import Workbook  # Only needed when exporting
     
-    # Create images directory
-    images_path = os.path.join(export_path, "images")
-    os.makedirs(images_path, exist_ok=True)
+    workbook = Workbook(write_only=True)
+    trees_sheet = workbook.create_sheet("Trees Overview")
+    trees_sheet.append(["Tree Number", "Name", "Species", "Date Acquired", "Trunk Width (mm)",
+                        "Training Age (years)", "True Age (years)", "Status"])
+    updates_sheet = workbook.create_sheet("Work History")
+    updates_sheet.append(["Tree Number", "Tree Name", "Date", "Trunk Width (mm)", "Work Performed"])
+    reminders_sheet = workbook.create_sheet("Reminders")
+    reminders_sheet.append(["Tree Number", "Tree Name", "Date", "Message", "Status"])
     
-    # Export tree data
-    trees_data = []
-    for tree in db.query(Tree).all():
-        tree_data = {
-            "tree_number": tree.tree_number,
-            "tree_name": tree.tree_name,
-            "species": tree.species_info.name,
-            "date_acquired": tree.date_acquired.isoformat(),
-            "origin_date": tree.origin_date.isoformat(),
-            "current_girth": tree.current_girth,
-            "notes": tree.notes,
-            "is_archived": tree.is_archived,
-            "training_age": tree.training_age,
-            "true_age": tree.true_age,
+    # Everything goes straight into the archive, with no staging directory.
+    # Images and the workbook are already compressed, so only the JSON is
+    # worth deflating
+    with ZipFile(zip_path, 'w', compression=ZIP_STORED) as zipf:
+        json_data = io.StringIO()
+        json_data.write("[")
+        
+        # Load every tree's related rows up front, one query per relationship
+        trees = db.query(Tree).options(
+            joinedload(Tree.species_info),
+            selectinload(Tree.updates),
+            selectinload(Tree.photos),
+            selectinload(Tree.reminders)
+        ).all()
+        for index, tree in enumerate(trees):
+            tree_data = {
+                "tree_number": tree.tree_number,
+                "tree_name": tree.tree_name,
+                "species": tree.species_info.name,
+                "date_acquired": tree.date_acquired.isoformat(),
+                "origin_date": tree.origin_date.isoformat(),
+                "current_girth": tree.current_girth,
+                "notes": tree.notes,
+                "is_archived": tree.is_archived,
+                "training_age": tree.training_age,
+                "true_age": tree.true_age,
+                
+                # Include related data
+                "updates": [{
+                    "date": update.update_date.isoformat(),
+                    "girth": update.girth,
+                    "work_performed": update.work_performed
+                } for update in tree.updates],
+                
+                "photos": [{
+                    "file_name": os.path.basename(photo.file_path),
+                    "photo_date": photo.photo_date.isoformat(),
+                    "description": photo.description,
+                    "is_starred": photo.is_starred
+                } for photo in tree.photos],
+                
+                "reminders": [{
+                    "date": reminder.reminder_date.isoformat(),
+                    "message": reminder.message,
+                    "is_completed": reminder.is_completed
+                } for reminder in tree.reminders]
+            }
+            json_data.write(",\n" if index else "\n")
+            json_data.write(json.dumps(tree_data, indent=2, ensure_ascii=False))
             
-            # Include related data
-            "updates": [{
-                "date": update.update_date.isoformat(),
-                "girth": update.girth,
-                "work_performed": update.work_performed
-            } for update in tree.updates],
+            trees_sheet.append([
+                tree_data["tree_number"],
+                tree_data["tree_name"],
+                tree_data["species"],
+                tree_data["date_acquired"],
+                tree_data["current_girth"],
+                round(tree_data["training_age"], 1),
+                round(tree_data["true_age"], 1),
+                "Archived" if tree_data["is_archived"] else "Active"
+            ])
+            for update in tree_data["updates"]:
+                updates_sheet.append([
+                    tree_data["tree_number"],
+                    tree_data["tree_name"],
+                    update["date"],
+                    update["girth"],
+                    update["work_performed"]
+                ])
+            for reminder in tree_data["reminders"]:
+                reminders_sheet.append([
+                    tree_data["tree_number"],
+                    tree_data["tree_name"],
+                    reminder["date"],
+                    reminder["message"],
+                    "Completed" if reminder["is_completed"] else "Pending"
+                ])
             
-            "photos": [{
-                "file_name": os.path.basename(photo.file_path),
-                "photo_date": photo.photo_date.isoformat(),
-                "description": photo.description,
-                "is_starred": photo.is_starred
-            } for photo in tree.photos],
+            # Add tree images. Photos from the same day share a file name; as
+            # before the last one wins
+            tree_images = {}
+            for photo in tree.photos:
+                if os.path.exists(photo.file_path):
+                    # Create filename with photo date
+                    photo_date = photo.photo_date.strftime("%Y%m%d")
+                    file_ext = os.path.splitext(photo.file_path)[1]
+                    new_filename = f"{photo_date}{file_ext}"
+                    tree_images[f"images/{tree.tree_number}/{new_filename}"] = photo.file_path
             
-            "reminders": [{
-                "date": reminder.reminder_date.isoformat(),
-                "message": reminder.message,
-                "is_completed": reminder.is_completed
-            } for reminder in tree.reminders]
-        }
-        trees_data.append(tree_data)
-        
-        # Copy tree images
-        tree_images_path = os.path.join(images_path, tree.tree_number)
-        os.makedirs(tree_images_path, exist_ok=True)
-        
-        for photo in tree.photos:
-            if os.path.exists(photo.file_path):
-                # Create filename with photo date
-                photo_date = photo.photo_date.strftime("%Y%m%d")
-                file_ext = os.path.splitext(photo.file_path)[1]
-                new_filename = f"{photo_date}{file_ext}"
-                
-                # Copy image to export directory
-                shutil.copy2(
-                    photo.file_path,
-                    os.path.join(tree_images_path, new_filename)
-                )
-    
-    # Save JSON data
-    with open(os.path.join(export_path, "trees_data.json"), 'w', encoding='utf-8') as f:
-        json.dump(trees_data, f, indent=2, ensure_ascii=False)
-    
-    # Create Excel export with multiple sheets
-    with pd.ExcelWriter(os.path.join(export_path, "bonsai_collection.xlsx")) as writer:
-        # Trees overview
-        trees_df = pd.DataFrame([{
-            "Tree Number": t["tree_number"],
-            "Name": t["tree_name"],
-            "Species": t["species"],
-            "Date Acquired": t["date_acquired"],
-            "Trunk Width (mm)": t["current_girth"],
-            "Training Age (years)": round(t["training_age"], 1),
-            "True Age (years)": round(t["true_age"], 1),
-            "Status": "Archived" if t["is_archived"] else "Active"
-        } for t in trees_data])
-        trees_df.to_excel(writer, sheet_name="Trees Overview", index=False)
+            for arcname, file_path in tree_images.items():
+                zipf.write(file_path, arcname)
         
-        # Work history
-        updates_data = []
-        for tree in trees_data:
-            for update in tree["updates"]:
-                updates_data.append({
-                    "Tree Number": tree["tree_number"],
-                    "Tree Name": tree["tree_name"],
-                    "Date": update["date"],
-                    "Trunk Width (mm)": update["girth"],
-                    "Work Performed": update["work_performed"]
-                })
-        pd.DataFrame(updates_data).to_excel(writer, sheet_name="Work History", index=False)
+        json_data.write("\n]\n")
+        zipf.writestr("trees_data.json", json_data.getvalue(), compress_type=ZIP_DEFLATED)
         
-        # Reminders
-        reminders_data = []
-        for tree in trees_data:
-            for reminder in tree["reminders"]:
-                reminders_data.append({
-                    "Tree Number": tree["tree_number"],
-                    "Tree Name": tree["tree_name"],
-                    "Date": reminder["date"],
-                    "Message": reminder["message"],
-                    "Status": "Completed" if reminder["is_completed"] else "Pending"
-                })
-        pd.DataFrame(reminders_data).to_excel(writer, sheet_name="Reminders", index=False)
-    
-    # Create zip file
-    zip_path = f"{export_path}.zip"
-    with ZipFile(zip_path, 'w') as zipf:
-        for root, dirs, files in os.walk(export_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, export_path)
-                zipf.write(file_path, arcname)
-    
-    # Clean up temporary export directory
-    shutil.rmtree(export_path)
+        workbook_data = io.BytesIO()
+        workbook.save(workbook_data)
+        zipf.writestr("bonsai_collection.xlsx", workbook_data.getvalue())
     
     return zip_path
 
@@ -272,81 +271,319 @@ def import_bonsai_data(db: Session, zip_file_path: str, image_dir="bonsai_images
 
                 db.commit()
 
+            get_last_tree_sequence.clear()
+            get_species_ids.clear()
+            list_image_dir.clear()
+            bump_data_version()
             return True
     except Exception as e:
         print(f"Error importing data: {e}")
+        db.rollback()
         return False
 
 
+def read_jpeg_datetime_original(image_path):
+    """Read DateTimeOriginal straight out of a JPEG's Exif APP1 segment
+
+    Only the first 64 KiB of the file are read and only the IFD entries on
+    the way to the tag are decoded. Returns None when the file is not a JPEG
+    or the tag is not where the standard layout puts it.
+    """
+    with open(image_path, 'rb') as f:
+        head = f.read(65536)
+    if head[:2] != b'\xff\xd8':
+        return None
+    
+    # Walk the marker segments up to the Exif APP1 block
+    pos = 2
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            return None
+        marker = head[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        if marker in (0xD9, 0xDA):  # End of image / start of scan data
+            return None
+        length = struct.unpack_from('>H', head, pos + 2)[0]
+        if marker == 0xE1 and head[pos + 4:pos + 10] == b'Exif\x00\x00':
+            tiff = head[pos + 10:pos + 2 + length]
+            if len(tiff) < length - 8:  # Segment runs past what we read
+                return None
+            break
+        pos += 2 + length
+    else:
+        return None
+    
+    # TIFF header: byte order, then offset of IFD0
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return None
+    
+    def find_entry(ifd_offset, wanted_tag):
+        entry_count = struct.unpack_from(endian + 'H', tiff, ifd_offset)[0]
+        for i in range(entry_count):
+            tag, value_type, count, value = struct.unpack_from(
+                endian + 'HHI4s', tiff, ifd_offset + 2 + 12 * i
+            )
+            if tag == wanted_tag:
+                return value_type, count, value
+        return None
+    
+    ifd0_offset = struct.unpack_from(endian + 'I', tiff, 4)[0]
+    exif_pointer = find_entry(ifd0_offset, 0x8769)  # Exif sub-IFD
+    if not exif_pointer:
+        return None
+    date_entry = find_entry(struct.unpack(endian + 'I', exif_pointer[2])[0], 0x9003)  # DateTimeOriginal
+    if not date_entry or date_entry[0] != 2:  # Must be ASCII
+        return None
+    
+    _, count, value = date_entry
+    if count > 4:
+        offset = struct.unpack(endian + 'I', value)[0]
+        value = tiff[offset:offset + count]
+        if len(value) < count:  # Truncated; let PIL read the whole file
+            return None
+    return value[:count].rstrip(b'\x00').decode('ascii')
+
 def get_exif_date(image_path):
     """Extract date from image EXIF data if available"""
     try:
-        image = Image.open(image_path)
-        exif = {
-            PIL.ExifTags.TAGS[k]: v
-            for k, v in image._getexif().items()
-            if k in PIL.ExifTags.TAGS
-        }
-        date_str = exif.get('DateTimeOriginal')
+        # PNGs carry no camera date, so don't bother parsing them
+        if image_path.lower().endswith('.png'):
+            return datetime.now()
+        
+        try:
+            date_str = read_jpeg_datetime_original(image_path)
+        except (struct.error, UnicodeDecodeError):
+            date_str = None
+        
+        if date_str is None:
+            # Non-standard layout: let PIL find the tag instead
+            with Image.open(image_path) as image:
+                # DateTimeOriginal lives in the Exif sub-IFD; read just that tag
+                # rather than building a name -> value dict of every tag
+                exif = image.getexif()
+                date_str = exif.get_ifd(PIL.ExifTags.IFD.Exif).get(PIL.ExifTags.Base.DateTimeOriginal)
         if date_str:
             return datetime.strptime(date_str, '%Y:%m:%d %H:%M:%S')
     except:
         pass
     return datetime.now()
 
-def generate_tree_number(db):
+def at_midnight(day):
+    """Turn a date from a date_input into a datetime at the start of that day"""
+    return datetime(day.year, day.month, day.day)
+
+@st.cache_data(ttl=60)
+def get_last_tree_sequence():
+    """Get the highest BON-### sequence number in use (cached across reruns)"""
+    with session_scope() as db:
+        last = db.query(
+            func.max(cast(func.substr(Tree.tree_number, 5), Integer))
+        ).filter(Tree.tree_number.like('BON-%')).scalar()
+        return last or 0
+
+def generate_tree_number():
     """Generate a unique tree number"""
-    tree_count = db.query(Tree).count()
-    return f"BON-{tree_count + 1:03d}"
+    return f"BON-{get_last_tree_sequence() + 1:03d}"
 
-def get_existing_species(db):
+@st.cache_data(ttl=300)
+def get_species_ids():
+    """Map species name to id, ordered by name (cached across reruns)"""
+    with session_scope() as db:
+        return dict(db.query(Species.name, Species.id).order_by(Species.name).all())
+
+def get_existing_species():
     """Get list of existing species from database"""
-    return [species.name for species in db.query(Species).order_by(Species.name).all()]
-
-def get_or_create_species(db, species_name):
-    """Get existing species or create new one"""
-    species = db.query(Species).filter(Species.name == species_name).first()
-    if not species:
-        species = Species(name=species_name)
-        db.add(species)
-        db.commit()
-    return species
+    return list(get_species_ids())
+
+def get_or_create_species_id(db, species_name):
+    """Get the id of an existing species or create a new one"""
+    # Picking an existing species is the common case and needs no query
+    species_id = get_species_ids().get(species_name)
+    if species_id is not None:
+        return species_id
+    
+    # Upsert so a species added by another session in the meantime
+    # doesn't fail on the unique name; RETURNING saves a re-select
+    species_id = db.scalar(
+        sqlite_insert(Species)
+        .values(name=species_name, created_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=['name'])
+        .returning(Species.id)
+    )
+    if species_id is None:
+        species_id = db.scalar(select(Species.id).where(Species.name == species_name))
+    # Left uncommitted so it lands in the caller's transaction
+    get_species_ids.clear()
+    return species_id
+
+IMAGE_DIR = os.path.join('data', 'images')
+LOGO_DIR = os.path.join('data', 'system')
+THUMBNAIL_DIR = os.path.join(DATA_DIR, 'thumbnails')
+DEFAULT_LOGO_PATH = os.path.join(DATA_DIR, 'system', 'logo.png')
+GALLERY_PAGE_SIZE = 12
+TREE_PAGE_SIZE = 12
+
+@st.cache_data(ttl=30)
+def list_image_dir(directory):
+    """Map each file name in an image directory to its mtime (one scandir per directory)"""
+    try:
+        with os.scandir(directory or '.') as entries:
+            return {entry.name: entry.stat().st_mtime for entry in entries if entry.is_file()}
+    except OSError:
+        return {}
+
+def get_file_mtime(file_path):
+    """Get a file's mtime from the cached directory listing, or None if it isn't there"""
+    directory, file_name = os.path.split(file_path)
+    return list_image_dir(directory).get(file_name)
+
+def photo_file_exists(file_path):
+    """Check a photo file exists using the cached directory listing"""
+    return get_file_mtime(file_path) is not None
+
+def get_thumbnail(image_path, size=512):
+    """Return the path of a downscaled copy of an image, creating it if needed"""
+    source_mtime = get_file_mtime(image_path)
+    if source_mtime is None:
+        return image_path
+    thumb_path = build_thumbnail(image_path, source_mtime, size)
+    
+    # The cached path outlives the file if the thumbnails folder is cleared
+    if thumb_path != image_path and not os.path.exists(thumb_path):
+        thumb_path = write_thumbnail(image_path, source_mtime, size)
+    return thumb_path
+
+@st.cache_data
+def build_thumbnail(image_path, source_mtime, size):
+    """Thumbnail path for an image, generated once per source modification time"""
+    return write_thumbnail(image_path, source_mtime, size)
+
+def write_thumbnail(image_path, source_mtime, size):
+    """Write a thumbnail to THUMBNAIL_DIR unless an up-to-date one exists"""
+    digest = hashlib.sha1(f"{os.path.abspath(image_path)}:{size}".encode()).hexdigest()
+    # PNGs (logos in particular) may be transparent, which JPEG can't keep
+    keep_alpha = image_path.lower().endswith('.png')
+    thumb_path = os.path.join(THUMBNAIL_DIR, f"{digest}{'.png' if keep_alpha else '.jpg'}")
+    if os.path.exists(thumb_path) and os.path.getmtime(thumb_path) >= source_mtime:
+        return thumb_path
+    
+    try:
+        os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+        # The prefetch worker and a page render can build the same thumbnail
+        # at once; write to a temp file and swap it in so no reader ever
+        # sees a half-written image
+        fd, temp_path = tempfile.mkstemp(dir=THUMBNAIL_DIR, suffix='.tmp')
+        os.close(fd)
+        try:
+            with Image.open(image_path) as image:
+                image.thumbnail((size, size), Image.Resampling.LANCZOS)
+                # Thumbnails are written once and served on every rerun, so
+                # spend the extra encode time on a smaller file
+                if keep_alpha:
+                    image.save(temp_path, 'PNG', optimize=True)
+                else:
+                    image.convert('RGB').save(temp_path, 'JPEG', quality=80, optimize=True)
+            os.replace(temp_path, thumb_path)
+        except Exception:
+            remove_file(temp_path)
+            raise
+        return thumb_path
+    except Exception as e:
+        print(f"Error creating thumbnail: {str(e)}")
+        return image_path
+
+def remove_file(file_path):
+    """Delete a file if it exists"""
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+
+def remove_files(file_paths):
+    """Delete several files concurrently, ignoring any that are already gone"""
+    if not file_paths:
+        return
+    
+    with ThreadPoolExecutor(max_workers=min(8, len(file_paths))) as executor:
+        list(executor.map(remove_file, file_paths))
+    list_image_dir.clear()
 
 def save_uploaded_images(uploaded_files):
-    """Save multiple uploaded images and return their paths"""
-    image_paths = []
-    for uploaded_file in uploaded_files:
-        path = save_uploaded_image(uploaded_file)
-        image_paths.append(path)
+    """Save multiple uploaded images concurrently and return their paths"""
+    if not uploaded_files:
+        return []
+    
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    
+    # File writes and PIL decode/encode release the GIL, so a small pool
+    # overlaps them; map() keeps the paths in upload order
+    with ThreadPoolExecutor(max_workers=min(8, len(uploaded_files))) as executor:
+        image_paths = list(executor.map(store_uploaded_image, uploaded_files))
+    
+    list_image_dir.clear()
     return image_paths
 
+@st.cache_resource
+def get_write_counter():
+    """Process-wide counter of writes that affect memoized reads"""
+    return {'version': 0}
+
+def bump_data_version():
+    """Invalidate every session's memoized query results after a write"""
+    get_write_counter()['version'] += 1
+
+def memoize_for_session(key, loader):
+    """Return the rows from loader(), reusing them on reruns until the next write
+
+    Rows are stored in session state as plain tuples so they outlive the
+    session that loaded them.
+    """
+    version = get_write_counter()['version']
+    cached = st.session_state.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    value = [tuple(row) for row in loader()]
+    st.session_state[key] = (version, value)
+    return value
+
 def show_work_history(tree_id):
     """Display work history, trunk measurements, and reminders for a specific tree"""
-    db = SessionLocal()
-    try:
-        tree = db.query(Tree).filter(Tree.id == tree_id).first()
+    with session_scope() as db:
+        tree = db.get(Tree, tree_id)
+        now = datetime.now()
         
         # Back button at the top
-        if st.button(":material/arrow_back: Back to Collection"):
-            st.session_state.page = "View Trees"
-            st.rerun()
+        st.button(":material/arrow_back: Back to Collection", on_click=set_page, args=("View Trees",))
             
         st.header(f"Work History: {tree.tree_name} *({tree.tree_number})*")
         
         # Growth History Chart in Expander
         with st.expander("📈 Growth History"):
             # Get all girth measurements from updates
-            measurements = db.query(TreeUpdate).filter(
-                TreeUpdate.tree_id == tree_id,
-                TreeUpdate.girth.isnot(None)
-            ).order_by(TreeUpdate.update_date).all()
+            measurements = memoize_for_session(
+                f"work_history_measurements_{tree_id}",
+                lambda: db.query(TreeUpdate.update_date, TreeUpdate.girth).filter(
+                    TreeUpdate.tree_id == tree_id,
+                    TreeUpdate.girth.isnot(None)
+                ).order_by(TreeUpdate.update_date).all()
+            )
             
             if measurements:
                 # Prepare data for chart
                 data = [{
-                    'date': update.update_date.strftime('%Y-%m'),
-                    'trunk width': update.girth
-                } for update in measurements]
+                    'date': update_date.strftime('%Y-%m'),
+                    'trunk width': girth
+                } for update_date, girth in measurements]
+                
+                # Heavy imports, only needed when there is something to plot
+                import pandas as pd
+                import plotly.express as px
                 
                 # Create chart using Streamlit
                 df = pd.DataFrame(data)
@@ -369,20 +606,28 @@ def show_work_history(tree_id):
         
         # Pending Reminders in Expander
         with st.expander("⏰ Pending Reminders"):
-            pending_reminders = db.query(Reminder).filter(
-                Reminder.tree_id == tree_id,
-                Reminder.is_completed == 0,
-                Reminder.reminder_date >= datetime.now()
-            ).order_by(Reminder.reminder_date).all()
+            # Memoize every open reminder and apply the date cutoff per rerun, so
+            # a reminder drops off once its date passes, not at the next write
+            open_reminders = memoize_for_session(
+                f"work_history_reminders_{tree_id}",
+                lambda: db.query(Reminder.reminder_date, Reminder.message).filter(
+                    Reminder.tree_id == tree_id,
+                    Reminder.is_completed == 0
+                ).order_by(Reminder.reminder_date).all()
+            )
+            pending_reminders = [
+                (reminder_date, message) for reminder_date, message in open_reminders
+                if reminder_date >= now
+            ]
             
             if pending_reminders:
-                for reminder in pending_reminders:
+                for reminder_date, message in pending_reminders:
                     with st.container():
                         col1, col2 = st.columns([1, 4])
                         with col1:
-                            st.write(reminder.reminder_date.strftime('%Y-%m-%d'))
+                            st.write(reminder_date.strftime('%Y-%m-%d'))
                         with col2:
-                            st.write(reminder.message)
+                            st.write(message)
                         st.markdown("---")
             else:
                 st.info("No pending reminders.")
@@ -391,14 +636,19 @@ def show_work_history(tree_id):
         if 'edit_update_id' not in st.session_state:
             st.session_state.edit_update_id = None
         
-        # Get tree updates
-        updates = db.query(TreeUpdate).filter(
+        # Get tree updates, only the columns the list shows
+        updates = db.query(
+            TreeUpdate.id,
+            TreeUpdate.update_date,
+            TreeUpdate.girth,
+            TreeUpdate.work_performed
+        ).filter(
             TreeUpdate.tree_id == tree_id
         ).order_by(TreeUpdate.update_date.desc()).all()
         
         # Display edit form if in edit mode
         if st.session_state.edit_update_id is not None:
-            update_to_edit = db.query(TreeUpdate).get(st.session_state.edit_update_id)
+            update_to_edit = db.get(TreeUpdate, st.session_state.edit_update_id)
             if update_to_edit:
                 st.subheader("Edit Update")
                 
@@ -421,10 +671,11 @@ def show_work_history(tree_id):
                 # Handle form submission
                 if save_button:
                     # Update the database
-                    update_to_edit.update_date = datetime.combine(edit_date, datetime.min.time())
+                    update_to_edit.update_date = at_midnight(edit_date)
                     update_to_edit.girth = edit_girth
                     update_to_edit.work_performed = edit_work
                     db.commit()
+                    bump_data_version()
                     
                     # Exit edit mode
                     st.session_state.edit_update_id = None
@@ -469,8 +720,9 @@ def show_work_history(tree_id):
                         with col1:
                             if st.button("Yes, Delete", key=f"confirm_yes_{update.id}"):
                                 # Delete the update
-                                db.delete(update)
+                                db.query(TreeUpdate).filter(TreeUpdate.id == update.id).delete()
                                 db.commit()
+                                bump_data_version()
                                 st.session_state.pop(f"confirm_delete_{update.id}")
                                 st.success("Entry deleted!")
                                 st.rerun()
@@ -484,75 +736,134 @@ def show_work_history(tree_id):
         else:
             st.info("No work history recorded yet.")
             
-    finally:
-        db.close()
 
-def create_responsive_grid(trees, db):
-    """Creates a responsive grid layout that adjusts based on container width"""
-    # We'll use container width classes from streamlit
-    container_width = st.get_container_width() if hasattr(st, 'get_container_width') else None
-    
-    # Default to 1 column for mobile-first approach
-    num_cols = 1
+def get_display_photo_paths(db, tree_ids):
+    """Get the file path of the photo to show on each tree's card, keyed by tree id.
+
+    A starred photo wins; otherwise the most recent photo is used.
+    """
+    if not tree_ids:
+        return {}
     
-    # Create columns based on available width
-    for i in range(0, len(trees), num_cols):
-        # Create a row using columns
-        cols = st.columns(num_cols)
+    # Rank each tree's photos starred-first, then newest-first, and keep the top one
+    ranked = (
+        db.query(
+            Photo.tree_id,
+            Photo.file_path,
+            func.row_number().over(
+                partition_by=Photo.tree_id,
+                order_by=(Photo.is_starred.desc(), Photo.photo_date.desc())
+            ).label('rank')
+        )
+        .filter(Photo.tree_id.in_(tree_ids))
+        .subquery()
+    )
+    return dict(
+        db.query(ranked.c.tree_id, ranked.c.file_path)
+        .filter(ranked.c.rank == 1)
+        .all()
+    )
+
+@st.cache_data(max_entries=8)
+def load_tree_cards(data_version, page):
+    """Get one page of active trees' card rows and photo paths, reloaded only after a write
+
+    data_version only keys the cache; pass get_write_counter()['version'].
+    Returns the rows, their photo paths, the page actually loaded (clamped
+    to the last page) and the number of pages.
+    """
+    with session_scope() as db:
+        tree_count = db.query(func.count(Tree.id)).filter(Tree.is_archived == 0).scalar()
+        page_count = max(1, (tree_count - 1) // TREE_PAGE_SIZE + 1)
+        page = min(page, page_count - 1)
         
-        # Fill each column in the row
-        for j in range(num_cols):
-            idx = i + j
-            if idx < len(trees):
-                with cols[j]:
-                    create_tree_card(trees[idx], db)
-
-def create_tree_card(tree, db):
-    """Update create_tree_card function with more responsive layout"""
+        # Each tree's latest update date, read straight off the
+        # (tree_id, update_date) index instead of grouping a join of every update
+        latest_update = (
+            select(func.max(TreeUpdate.update_date))
+            .where(TreeUpdate.tree_id == Tree.id)
+            .correlate(Tree)
+            .scalar_subquery()
+        )
+        
+        # Query the columns the cards show, with each tree's latest update date,
+        # as plain rows rather than Tree objects
+        trees = (
+            db.query(
+                Tree.id,
+                Tree.tree_name,
+                Tree.notes,
+                Species.name.label('species_name'),
+                latest_update.label('latest_update')
+            )
+            .join(Tree.species_info)
+            .filter(Tree.is_archived == 0)
+            .order_by(
+                # Sort by latest update date descending. Order by the selected
+                # label so the subquery runs once per tree; SQLite already puts
+                # NULLs (trees with no updates) last in a descending sort
+                desc('latest_update'),
+                Tree.id
+            )
+            .limit(TREE_PAGE_SIZE)
+            .offset(page * TREE_PAGE_SIZE)
+            .all()
+        )
+        
+        # Fetch every card's photo up front instead of querying per card
+        photo_paths = get_display_photo_paths(db, [tree.id for tree in trees])
+    return trees, photo_paths, page, page_count
+
+@st.cache_resource
+def get_prefetch_executor():
+    """Single background worker shared by all sessions for warming caches"""
+    return ThreadPoolExecutor(max_workers=1)
+
+@st.cache_resource
+def get_prefetched_pages():
+    """(data_version, page) pairs already handed to the prefetch worker"""
+    return set()
+
+def prefetch_tree_page(data_version, page):
+    """Warm the card cache and thumbnails for a page the user is likely to open next"""
+    try:
+        trees, photo_paths, _, _ = load_tree_cards(data_version, page)
+        for photo_path in photo_paths.values():
+            if photo_file_exists(photo_path):
+                get_thumbnail(photo_path)
+    except Exception as e:
+        print(f"Error prefetching tree page: {str(e)}")
+
+def create_tree_card(tree, photo_path, latest_update):
+    """Update create_tree_card function with more responsive layout
+
+    tree is a row with id, tree_name, notes and species_name.
+    """
     with st.container():
-        with st.expander(f"**{tree.tree_name.strip()}**  \n*{tree.species_info.name.strip()}*", expanded=False):
+        with st.expander(f"**{tree.tree_name.strip()}**  \n*{tree.species_name.strip()}*", expanded=False):
             # Make buttons more touch-friendly on mobile
             button_cols = st.columns([1, 1, 1, 1])
             
             with button_cols[0]:
-                if st.button("",icon= ":material/photo_library:", key=f"gallery_{tree.id}", use_container_width=True, help="View Gallery"):
-                    st.session_state.page = "Tree Gallery"
-                    st.session_state.selected_tree = tree.id
-                    st.rerun()
+                st.button("",icon= ":material/photo_library:", key=f"gallery_{tree.id}", use_container_width=True, help="View Gallery",
+                          on_click=set_page_and_tree, args=("Tree Gallery", tree.id))
             
 
             
             with button_cols[1]:
-                if st.button("",icon= ":material/history:", key=f"work_history_{tree.id}", use_container_width=True, help="View Work History"):
-                    st.session_state.page = "Work History"
-                    st.session_state.selected_tree = tree.id
-                    st.rerun()
+                st.button("",icon= ":material/history:", key=f"work_history_{tree.id}", use_container_width=True, help="View Work History",
+                          on_click=set_page_and_tree, args=("Work History", tree.id))
                     
             with button_cols[2]:
-                if st.button("",icon= ":material/edit:", key=f"edit_{tree.id}", use_container_width=True, help="Edit Tree Details"):
-                    st.session_state.page = "Edit Tree"
-                    st.session_state.selected_tree = tree.id
-                    st.rerun()
+                st.button("",icon= ":material/edit:", key=f"edit_{tree.id}", use_container_width=True, help="Edit Tree Details",
+                          on_click=set_page_and_tree, args=("Edit Tree", tree.id))
             with button_cols[3]:
-                if st.button("",icon= ":material/post_add:", key=f"update_{tree.id}", use_container_width=True, help="Add Update"):
-                    st.session_state.page = "Update Tree"
-                    st.session_state.selected_tree = tree.id
-                    st.rerun()
+                st.button("",icon= ":material/post_add:", key=f"update_{tree.id}", use_container_width=True, help="Add Update",
+                          on_click=set_page_and_tree, args=("Update Tree", tree.id))
             
             # Image handling
-            display_photo = (
-                db.query(Photo)
-                .filter(Photo.tree_id == tree.id, Photo.is_starred == 1)
-                .first()
-                or
-                db.query(Photo)
-                .filter(Photo.tree_id == tree.id)
-                .order_by(Photo.photo_date.desc())
-                .first()
-            )
-            
-            if display_photo and os.path.exists(display_photo.file_path):
-                st.image(display_photo.file_path, use_container_width =True)
+            if photo_path and photo_file_exists(photo_path):
+                st.image(get_thumbnail(photo_path), use_container_width =True)
             else:
                 st.image("https://via.placeholder.com/150", use_container_width =True)
             
@@ -560,17 +871,29 @@ def create_tree_card(tree, db):
             if tree.notes:
                 st.write("**Note:**", tree.notes)
             
-            latest_update = db.query(TreeUpdate).filter(
-                TreeUpdate.tree_id == tree.id
-            ).order_by(TreeUpdate.update_date.desc()).first()
-            
             if latest_update:
-                st.write(f"**Last Update:** {latest_update.update_date.strftime('%Y-%m-%d')}")                
+                st.write(f"**Last Update:** {latest_update.strftime('%Y-%m-%d')}")                
+
+def set_page(page, reset_forms=False):
+    """Button callback that switches page before the next rerun starts"""
+    if reset_forms:
+        reset_form_states()
+    st.session_state.page = page
+
+def leave_gallery():
+    """Button callback that returns from the gallery to the collection"""
+    st.session_state.page = "View Trees"
+    st.session_state.gallery_initialized = False
+
+def set_state(key, value):
+    """Button callback that sets one session state value"""
+    st.session_state[key] = value
 
 def set_page_and_tree(page, tree_id=None):
     """Helper function to set both page and selected tree"""
     st.session_state.page = page
     st.session_state.selected_tree = tree_id
+    st.session_state.gallery_page = 0
     
 def handle_edit_cancel(photo_id):
     """Handle canceling edit mode"""
@@ -582,9 +905,8 @@ def handle_delete_cancel(photo_id):
 
 def show_tree_gallery(tree_id):
     """Display gallery view for a specific tree with photo management functionality"""
-    db = SessionLocal()
-    try:
-        tree = db.query(Tree).filter(Tree.id == tree_id).first()
+    with session_scope() as db:
+        tree = db.get(Tree, tree_id, options=[joinedload(Tree.species_info)])
         
         # Reset states only when first entering the gallery
         if 'gallery_initialized' not in st.session_state:
@@ -594,34 +916,45 @@ def show_tree_gallery(tree_id):
             st.session_state.gallery_initialized = True
         
         # Add "Back to Collection" button at the top
-        if st.button(":material/arrow_back: Back to Collection"):
-            st.session_state.page = "View Trees"
-            st.session_state.gallery_initialized = False
-            st.rerun()
+        st.button(":material/arrow_back: Back to Collection", on_click=leave_gallery)
         
         
         
         st.header(f"{tree.species_info.name} *({tree.tree_number})*")
             
-        photos = db.query(Photo).filter(
-            Photo.tree_id == tree_id
-        ).order_by(Photo.photo_date).all()
+        # Only one page of photos is loaded and rendered at a time
+        photo_count = db.query(func.count(Photo.id)).filter(Photo.tree_id == tree_id).scalar()
         
         # No photos message
-        if not photos:
+        if not photo_count:
             st.info("No photos available for this tree.")
             return
         
+        # Clamp the page in case photos were deleted since it was chosen
+        page_count = (photo_count - 1) // GALLERY_PAGE_SIZE + 1
+        page = min(st.session_state.get('gallery_page', 0), page_count - 1)
+        st.session_state.gallery_page = page
+        
+        # Plain rows are enough to render the page; edits go through bulk statements
+        photos = (
+            db.query(Photo.id, Photo.file_path, Photo.photo_date, Photo.is_starred)
+            .filter(Photo.tree_id == tree_id)
+            .order_by(Photo.photo_date, Photo.id)  # id breaks same-day ties so pages never overlap
+            .limit(GALLERY_PAGE_SIZE)
+            .offset(page * GALLERY_PAGE_SIZE)
+            .all()
+        )
+        
         col1, col2, col3 = st.columns([1, 8, 6])
         
         with col2:
             # Photo display loop
             for photo in photos:
                 tree_galler_grid = grid(1,[10,1.5,1.5,1.5])
-                if os.path.exists(photo.file_path):
+                if photo_file_exists(photo.file_path):
                     # Create a unique key for each photo's container
 
-                    tree_galler_grid.image(photo.file_path, use_container_width =True)
+                    tree_galler_grid.image(get_thumbnail(photo.file_path, size=1024), use_container_width =True)
                             
                     # Initialize session state for edit mode
                     edit_key = f"edit_mode_{photo.id}"
@@ -640,8 +973,12 @@ def show_tree_gallery(tree_id):
                         # Save button
                         with col1:
                             if st.button("Save", key=f"save_{photo.id}", use_container_width=True):
-                                photo.photo_date = datetime.combine(new_date, datetime.min.time())
+                                db.query(Photo).filter(Photo.id == photo.id).update(
+                                    {"photo_date": at_midnight(new_date)},
+                                    synchronize_session=False
+                                )
                                 db.commit()
+                                bump_data_version()
                                 st.session_state[edit_key] = False
                                 st.rerun()
                         
@@ -660,15 +997,13 @@ def show_tree_gallery(tree_id):
                             # Star/unstar button
                             star_icon = "⭐" if photo.is_starred else "☆"
                             if st.button(star_icon, key=f"star_{photo.id}", use_container_width=True, type = "secondary"):
-                                # Unstar all other photos for this tree
-                                if not photo.is_starred:
-                                    db.query(Photo).filter(
-                                        Photo.tree_id == tree_id,
-                                        Photo.id != photo.id
-                                    ).update({"is_starred": 0})
-                                # Toggle star status for this photo
-                                photo.is_starred = 1 - photo.is_starred
+                                # Toggle this photo and unstar all others in one statement
+                                db.query(Photo).filter(Photo.tree_id == tree_id).update(
+                                    {"is_starred": case((Photo.id == photo.id, 1 - photo.is_starred), else_=0)},
+                                    synchronize_session=False
+                                )
                                 db.commit()
+                                bump_data_version()
                                 st.rerun()
                         
                     
@@ -693,12 +1028,12 @@ def show_tree_gallery(tree_id):
                         if st.button("Yes", key=f"confirm_yes_{photo.id}"):
                             try:
                                 # First remove the file if it exists
-                                if os.path.exists(photo.file_path):
-                                    os.remove(photo.file_path)
+                                remove_files([photo.file_path])
                                 
                                 # Then delete from database
-                                db.delete(photo)
+                                db.query(Photo).filter(Photo.id == photo.id).delete(synchronize_session=False)
                                 db.commit()
+                                bump_data_version()
                                 st.success("Photo deleted successfully")
                                 
                                 # Clear the confirmation state
@@ -714,21 +1049,28 @@ def show_tree_gallery(tree_id):
                             st.rerun()
                             
                 st.markdown("")
+            
+            # Page navigation
+            if page_count > 1:
+                nav_cols = st.columns([1, 2, 1])
+                with nav_cols[0]:
+                    st.button("Previous", key="gallery_prev", disabled=page == 0, use_container_width=True,
+                              on_click=set_state, args=("gallery_page", page - 1))
+                with nav_cols[1]:
+                    st.markdown(f"<p style='text-align: center'>Page {page + 1} of {page_count}</p>", unsafe_allow_html=True)
+                with nav_cols[2]:
+                    st.button("Next", key="gallery_next", disabled=page == page_count - 1, use_container_width=True,
+                              on_click=set_state, args=("gallery_page", page + 1))
 
-    finally:
-        db.close()
         
 def show_update_form(tree_id):
     """Display the update form for a specific tree"""
-    db = SessionLocal()
-    try:
-        tree = db.query(Tree).filter(Tree.id == tree_id).first()
+    with session_scope() as db:
+        tree = db.get(Tree, tree_id)
         
-        if st.button(":material/arrow_back: Back to Collection"):
-            # Reset form states before navigating away
-            reset_form_states()
-            st.session_state.page = "View Trees"
-            st.rerun()
+        # Reset form states before navigating away
+        st.button(":material/arrow_back: Back to Collection", on_click=set_page, args=("View Trees",),
+                  kwargs={"reset_forms": True})
             
         st.header(f"Update: {tree.tree_name} ({tree.tree_number})")
 
@@ -801,7 +1143,7 @@ def show_update_form(tree_id):
                             # Create tree update with specified date
                             update = TreeUpdate(
                                 tree_id=tree_id,
-                                update_date=datetime.combine(update_date, datetime.min.time()),
+                                update_date=at_midnight(update_date),
                                 girth=current_girth,
                                 work_performed=work_description
                             )
@@ -814,28 +1156,32 @@ def show_update_form(tree_id):
                             if uploaded_files:
                                 image_paths = save_uploaded_images(uploaded_files)
                                 
-                                for index, path in enumerate(image_paths):
-                                    photo_date = get_exif_date(path)
-                                    
-                                    photo = Photo(
+                                # Read the EXIF dates concurrently, then add all photos at once
+                                with ThreadPoolExecutor(max_workers=min(8, len(image_paths))) as executor:
+                                    photo_dates = list(executor.map(get_exif_date, image_paths))
+                                
+                                db.add_all([
+                                    Photo(
                                         tree_id=tree_id,
                                         file_path=path,
                                         photo_date=photo_date,
                                         description=work_description
                                     )
-                                    db.add(photo)
+                                    for path, photo_date in zip(image_paths, photo_dates)
+                                ])
                             
                             # Create reminder if specified
                             if st.session_state[session_key]:
                                 reminder = Reminder(
                                     tree_id=tree_id,
-                                    reminder_date=datetime.combine(reminder_date, datetime.min.time()),
+                                    reminder_date=at_midnight(reminder_date),
                                     message=reminder_message
                                 )
                                 db.add(reminder)
                             
                             # Commit all changes
                             db.commit()
+                            bump_data_version()
                             
                             st.success("Update saved successfully!")
                             # Reset the form state and reminder state
@@ -859,6 +1205,7 @@ def show_update_form(tree_id):
                         db.add(update)
                         tree.is_archived = 1
                         db.commit()
+                        bump_data_version()
                         st.success(f"Tree {tree.tree_number} added to the graveyard.")
                         # Reset form states
                         reset_form_states()
@@ -867,195 +1214,269 @@ def show_update_form(tree_id):
                     except Exception as e:
                         st.error(f"Error archiving tree: {str(e)}")
                         db.rollback()
-    finally:
-        db.close()
+
+@st.cache_data(max_entries=64)
+def get_preview_image(file_id, _uploaded_file, size=300):
+    """Return small JPEG bytes for previewing an upload, decoded once per file"""
+    _uploaded_file.seek(0)
+    with Image.open(_uploaded_file) as image:
+        image.thumbnail((size, size))
+        buffer = io.BytesIO()
+        image.convert('RGB').save(buffer, format='JPEG', quality=80)
+    _uploaded_file.seek(0)
+    return buffer.getvalue()
 
 def show_add_tree_form():
     """Display the form for adding a new tree"""
-    # Get existing species list
-    db = SessionLocal()
-    existing_species = get_existing_species(db)
+    # Add "Back to Collection" button at the top
+    st.button(":material/arrow_back: Back to Collection", on_click=set_page, args=("View Trees",))
     
-    # Ensure "Add New Species" is an option
-    species_options = ["Add New Species"] + existing_species
+    st.header("Add New Tree")
+    with session_scope() as db:
+        # Get existing species list
+        existing_species = get_existing_species()
     
-    # Determine current species selection (default to last species or "Add New Species")
-    current_species = existing_species[-1] if existing_species else "Add New Species"
+        # Ensure "Add New Species" is an option
+        species_options = ["Add New Species"] + existing_species
     
-    # Create a container with a border
-    with st.container(border=True):
-        tree_name = st.text_input(
-            "Tree Name",
-            help="Give your tree a personal name"
-        )
-        
-        # Species selection
-        species_selection = st.selectbox(
-            "Species*",
-            options=species_options,
-            index=species_options.index(current_species),
-            help="Select existing species or add new one"
-        )
+        # Determine current species selection (default to last species or "Add New Species")
+        current_species = existing_species[-1] if existing_species else "Add New Species"
+    
+        # Create a container with a border
+        with st.container(border=True):
+            tree_name = st.text_input(
+                "Tree Name",
+                help="Give your tree a personal name"
+            )
         
-        # Conditionally show new species input
-        if species_selection == "Add New Species":
-            new_species = st.text_input(
-                "Enter New Species Name*",
-                help="Enter the botanical or common name of your tree"
+            # Species selection
+            species_selection = st.selectbox(
+                "Species*",
+                options=species_options,
+                index=species_options.index(current_species),
+                help="Select existing species or add new one"
             )
         
-        with st.form(key="new_tree_form", clear_on_submit=True, border=False):
-            # Get a new tree number (display only)
-            new_tree_number = generate_tree_number(db)
-            st.info(f"Tree Number will be: {new_tree_number}")
+            # Conditionally show new species input
+            if species_selection == "Add New Species":
+                new_species = st.text_input(
+                    "Enter New Species Name*",
+                    help="Enter the botanical or common name of your tree"
+                )
+        
+            with st.form(key="new_tree_form", clear_on_submit=True, border=False):
+                # Get a new tree number (display only)
+                new_tree_number = generate_tree_number()
+                st.info(f"Tree Number will be: {new_tree_number}")
             
-            # Rest of the form
-            col1, col2 = st.columns(2)
+                # Rest of the form
+                col1, col2 = st.columns(2)
             
-            with col1:
-                current_girth = st.number_input("Current Trunk Width (mm)", 
-                    min_value=0.0, step=0.1)
+                with col1:
+                    current_girth = st.number_input("Current Trunk Width (mm)", 
+                        min_value=0.0, step=0.1)
             
-            with col2:
-                date_acquired = st.date_input("Date Acquired*",
-                    help="When did you acquire this tree?")
-                origin_date = st.date_input("Origin Date*",
-                    help="Estimated start date of the tree (for age calculation)")
+                with col2:
+                    date_acquired = st.date_input("Date Acquired*",
+                        help="When did you acquire this tree?")
+                    origin_date = st.date_input("Origin Date*",
+                        help="Estimated start date of the tree (for age calculation)")
                 
-            notes = st.text_area("Notes", 
-                help="Any special notes about this tree")
+                notes = st.text_area("Notes", 
+                    help="Any special notes about this tree")
             
-            uploaded_file = st.file_uploader("Upload Initial Photo", 
-                type=['png', 'jpg', 'jpeg'])
+                uploaded_file = st.file_uploader("Upload Initial Photo", 
+                    type=['png', 'jpg', 'jpeg'])
             
-            if uploaded_file is not None:
-                image = Image.open(uploaded_file)
-                st.image(image, caption="Preview", width=300)
+                if uploaded_file is not None:
+                    st.image(get_preview_image(uploaded_file.file_id, uploaded_file), caption="Preview", width=300)
             
-            submit_button = st.form_submit_button("Add Tree")
+                submit_button = st.form_submit_button("Add Tree")
             
-            if submit_button:
-                if not species_selection:
-                    st.error("Species is required!")
-                    return
+                if submit_button:
+                    if not species_selection:
+                        st.error("Species is required!")
+                        return
                 
-                try:
-                    # Determine species (new or existing)
-                    if species_selection == "Add New Species":
-                        species = new_species
-                    else:
-                        species = species_selection
+                    try:
+                        # Determine species (new or existing)
+                        if species_selection == "Add New Species":
+                            species = new_species
+                        else:
+                            species = species_selection
                     
-                    # Get or create species
-                    species_obj = get_or_create_species(db, species)
+                        # Get or create species
+                        species_id = get_or_create_species_id(db, species)
                     
-                    # Create new tree
-                    new_tree = Tree(
-                        tree_number=new_tree_number,
-                        tree_name=tree_name,
-                        species_id=species_obj.id,
-                        date_acquired=datetime.combine(date_acquired, datetime.min.time()),
-                        origin_date=datetime.combine(origin_date, datetime.min.time()),
-                        current_girth=current_girth,
-                        notes=notes
-                    )
+                        # Create new tree
+                        new_tree = Tree(
+                            tree_number=new_tree_number,
+                            tree_name=tree_name,
+                            species_id=species_id,
+                            date_acquired=at_midnight(date_acquired),
+                            origin_date=at_midnight(origin_date),
+                            current_girth=current_girth,
+                            notes=notes
+                        )
                     
-                    db.add(new_tree)
-                    db.commit()
+                        db.add(new_tree)
+                        db.flush()  # Assigns new_tree.id without a separate commit
                     
-                    # Handle photo if uploaded
-                    if uploaded_file:
-                        image_path = save_uploaded_image(uploaded_file)
-                        photo = Photo(
-                            tree_id=new_tree.id,
-                            file_path=image_path,
-                            photo_date=datetime.now(),
-                            description="Initial photo"
-                        )
-                        db.add(photo)
+                        # Handle photo if uploaded
+                        if uploaded_file:
+                            image_path = save_uploaded_image(uploaded_file)
+                            photo = Photo(
+                                tree_id=new_tree.id,
+                                file_path=image_path,
+                                photo_date=datetime.now(),
+                                description="Initial photo"
+                            )
+                            db.add(photo)
+                    
+                        # Species, tree and photo go in one transaction
                         db.commit()
+                        get_last_tree_sequence.clear()
+                        bump_data_version()
                     
-                    st.success(f"Tree {new_tree.tree_number} added successfully!")
-                    st.session_state.page = "View Trees"
-                    st.rerun()
+                        st.success(f"Tree {new_tree.tree_number} added successfully!")
+                        st.session_state.page = "View Trees"
+                        st.rerun()
                     
-                except Exception as e:
-                    st.error(f"Error adding tree: {str(e)}")
-        
-    db.close()
+                    except IntegrityError as e:
+                        # A cached species id may point at a row that no longer exists
+                        get_species_ids.clear()
+                        st.error(f"Error adding tree: {str(e)}")
+                        db.rollback()
+                    except Exception as e:
+                        st.error(f"Error adding tree: {str(e)}")
+                        db.rollback()
 
 def show_graveyard_trees():
     """Display trees in the graveyard with their final update."""
+    # Add back button at the top
+    st.button(":material/arrow_back: Back to Collection", on_click=set_page, args=("View Trees",))
+    
     st.header("Bonsai Graveyard")
     
-    db = SessionLocal()
-    try:
-        graveyard_trees = db.query(Tree).filter(Tree.is_archived == 1).all()
+    with session_scope() as db:
+        # Only the columns the table shows, with each tree's newest update inline
+        final_update = (
+            select(TreeUpdate.work_performed)
+            .where(TreeUpdate.tree_id == Tree.id)
+            .order_by(TreeUpdate.update_date.desc())
+            .limit(1)
+            .correlate(Tree)
+            .scalar_subquery()
+        )
+        graveyard_trees = (
+            db.query(
+                Tree.id,
+                Tree.tree_name,
+                Tree.tree_number,
+                Species.name.label("species"),
+                final_update.label("final_update")
+            )
+            .join(Tree.species_info)
+            .filter(Tree.is_archived == 1)
+            .all()
+        )
         
         if not graveyard_trees:
             st.info("No trees in the graveyard yet.")
             return
         
-        for tree in graveyard_trees:
-            with st.container():
-                col1, col2, col3 = st.columns([10, 1, 1])
-                
-                with col1:
-                    st.write(f"**{tree.tree_name.strip()}** ({tree.tree_number})  \n*{tree.species_info.name.strip()}*")
+        trees_by_id = {tree.id: tree for tree in graveyard_trees}
+        
+        # Confirm permanent deletion of the trees selected on the last submit
+        pending_delete = [
+            trees_by_id[tree_id]
+            for tree_id in st.session_state.get("graveyard_pending_delete", [])
+            if tree_id in trees_by_id
+        ]
+        if pending_delete:
+            names = ", ".join(f"{tree.tree_name.strip()} ({tree.tree_number})" for tree in pending_delete)
+            st.warning(f"Are you sure you want to delete these trees forever? {names}")
+            col1, col2, col3 = st.columns([1, 1, 8])
+            with col1:
+                if st.button("Yes, Delete", key="confirm_graveyard_delete", use_container_width=True):
+                    tree_ids = [tree.id for tree in pending_delete]
                     
-                    last_update = (
-                        db.query(TreeUpdate)
-                        .filter(TreeUpdate.tree_id == tree.id)
-                        .order_by(TreeUpdate.update_date.desc())
-                        .first()
-                    )
-                    if last_update:
-                        st.write(f"**Final Update:** {last_update.work_performed}")
-                    else:
-                        st.write("No final update recorded.")
-                
-                with col2:
-                    if st.button("Restore", key=f"restore_{tree.id}", use_container_width=True):
-                        tree.is_archived = 0
-                        db.commit()
-                        st.success(f"Tree {tree.tree_number} restored!")
-                        st.rerun()
-                
-                with col3:
-                    if state_button("Delete Forever", key=f"delete_{tree.id}", use_container_width=True):
-                        if "confirm_delete" not in st.session_state:
-                            st.session_state.confirm_delete = False
-                        
-                        if not st.session_state.confirm_delete:
-                            st.warning("Are you sure you want to delete this tree forever?")
-                            if st.button("Yes, Delete", key=f"confirm_delete_{tree.id}"):
-                                st.session_state.confirm_delete = True
-                                st.rerun()
-                        else:
-                            # Delete associated photos from filesystem
-                            for photo in tree.photos:
-                                if os.path.exists(photo.file_path):
-                                    os.remove(photo.file_path)
-                            
-                            # Delete tree from database
-                            db.delete(tree)
-                            db.commit()
-                            st.success(f"Tree {tree.tree_number} deleted permanently!")
-                            st.rerun()
-                        
-            st.markdown("---")
-    finally:
-        db.close()
+                    # Delete associated photos from filesystem
+                    photo_paths = [
+                        path for (path,) in
+                        db.query(Photo.file_path).filter(Photo.tree_id.in_(tree_ids)).all()
+                    ]
+                    remove_files(photo_paths)
+                    
+                    # Delete trees and their rows from database, one statement per table
+                    for model in (Photo, TreeUpdate, Reminder):
+                        db.query(model).filter(model.tree_id.in_(tree_ids)).delete(synchronize_session=False)
+                    db.query(Tree).filter(Tree.id.in_(tree_ids)).delete(synchronize_session=False)
+                    db.commit()
+                    get_last_tree_sequence.clear()
+                    bump_data_version()
+                    del st.session_state.graveyard_pending_delete
+                    st.rerun()
+            with col2:
+                if st.button("Cancel", key="cancel_graveyard_delete", use_container_width=True):
+                    del st.session_state.graveyard_pending_delete
+                    st.rerun()
+        
+        import pandas as pd  # Heavy import, only needed when there are rows to show
+        
+        # One editable table instead of a container and buttons per tree
+        graveyard_df = pd.DataFrame([{
+            "id": tree.id,
+            "Name": tree.tree_name.strip(),
+            "Tree Number": tree.tree_number,
+            "Species": tree.species.strip(),
+            "Final Update": tree.final_update or "No final update recorded.",
+            "Restore": False,
+            "Delete Forever": False
+        } for tree in graveyard_trees])
+        
+        with st.form("graveyard_form", border=False):
+            edited_df = st.data_editor(
+                graveyard_df,
+                hide_index=True,
+                use_container_width=True,
+                disabled=["Name", "Tree Number", "Species", "Final Update"],
+                column_config={
+                    "id": None,
+                    "Final Update": st.column_config.TextColumn(width="large"),
+                    "Restore": st.column_config.CheckboxColumn(help="Move the tree back to the collection"),
+                    "Delete Forever": st.column_config.CheckboxColumn(help="Permanently delete the tree and its photos")
+                },
+                key="graveyard_editor"
+            )
+            submitted = st.form_submit_button("Apply Changes")
+        
+        if submitted:
+            restore_ids = [int(tree_id) for tree_id in edited_df.loc[edited_df["Restore"], "id"]]
+            delete_ids = [
+                int(tree_id) for tree_id in
+                edited_df.loc[edited_df["Delete Forever"] & ~edited_df["Restore"], "id"]
+            ]
+            
+            if restore_ids:
+                db.query(Tree).filter(Tree.id.in_(restore_ids)).update(
+                    {"is_archived": 0}, synchronize_session=False
+                )
+                db.commit()
+                bump_data_version()
+            if delete_ids:
+                st.session_state.graveyard_pending_delete = delete_ids
+            if restore_ids or delete_ids:
+                st.rerun()
 
 def show_edit_tree_form(tree_id):
     """Display the form for editing an existing tree's details"""
-    db = SessionLocal()
-    try:
+    with session_scope() as db:
         # Fetch the existing tree
-        tree = db.query(Tree).filter(Tree.id == tree_id).first()
+        tree = db.get(Tree, tree_id, options=[joinedload(Tree.species_info)])
         
         # Get existing species list
-        existing_species = get_existing_species(db)
+        existing_species = get_existing_species()
         
         # Ensure "Add New Species" is an option
         species_options = ["Add New Species"] + existing_species
@@ -1127,31 +1548,40 @@ def show_edit_tree_form(tree_id):
                             species = species_selection
                         
                         # Get or create species
-                        species_obj = get_or_create_species(db, species)
+                        species_id = get_or_create_species_id(db, species)
                         
-                        # Update tree details
-                        tree.tree_name = tree_name
-                        tree.species_id = species_obj.id
-                        tree.date_acquired = datetime.combine(date_acquired, datetime.min.time())
-                        tree.origin_date = datetime.combine(origin_date, datetime.min.time())
-                        tree.notes = notes
+                        # Update tree details in one statement, without ORM change tracking
+                        db.query(Tree).filter(Tree.id == tree_id).update({
+                            "tree_name": tree_name,
+                            "species_id": species_id,
+                            "date_acquired": at_midnight(date_acquired),
+                            "origin_date": at_midnight(origin_date),
+                            "notes": notes
+                        }, synchronize_session=False)
                         
                         db.commit()
+                        bump_data_version()
                         
                         st.success("Tree details updated successfully!")
                         st.session_state.page = "View Trees"
                         st.rerun()
                         
+                    except IntegrityError as e:
+                        # A cached species id may point at a row that no longer exists
+                        get_species_ids.clear()
+                        st.error(f"Error updating tree: {str(e)}")
+                        db.rollback()
                     except Exception as e:
                         st.error(f"Error updating tree: {str(e)}")
+                        db.rollback()
     
-    finally:
-        db.close()
 
 def get_pending_reminders(db):
     """Get reminders that are due or overdue and not yet completed"""
     today = datetime.now().date()
-    pending_reminders = db.query(Reminder, Tree).join(Tree).filter(
+    pending_reminders = db.query(
+        Reminder.id, Reminder.reminder_date, Reminder.message, Tree.tree_name
+    ).join(Tree).filter(
         Reminder.reminder_date <= today,
         Reminder.is_completed == 0
     ).all()
@@ -1163,13 +1593,12 @@ def show_reminder_popup():
     if 'reminders_checked' not in st.session_state:
         st.session_state.reminders_checked = False
         
-        db = SessionLocal()
-        try:
+        with session_scope() as db:
             pending_reminders = get_pending_reminders(db)
             
             if pending_reminders:
                 # Initialize checkbox states
-                for reminder, _ in pending_reminders:
+                for reminder in pending_reminders:
                     if f"reminder_{reminder.id}" not in st.session_state:
                         st.session_state[f"reminder_{reminder.id}"] = False
                 
@@ -1187,23 +1616,29 @@ def show_reminder_popup():
                     
                     # Add a form to handle the checkboxes
                     with st.form(key="reminder_form",border=False):
-                        for reminder, tree in pending_reminders:
+                        for reminder in pending_reminders:
                             reminder_key = f"reminder_{reminder.id}"
                             # Add CSS to allow line breaks in checkbox labels
                             
 
                             # Create the checkbox with a newline separating the two lines
                             st.checkbox(
-                                f"**Due: {reminder.reminder_date.strftime('%Y-%m-%d')}** (*{tree.tree_name}*)\n{reminder.message}",
+                                f"**Due: {reminder.reminder_date.strftime('%Y-%m-%d')}** (*{reminder.tree_name}*)\n{reminder.message}",
                                 key=reminder_key
                             )
                         
                         # Submit button to process checked reminders
                         if st.form_submit_button("Mark Selected as Complete"):
-                            for reminder, _ in pending_reminders:
-                                if st.session_state[f"reminder_{reminder.id}"]:
-                                    reminder.is_completed = 1
-                                    db.commit()
+                            completed_ids = [
+                                reminder.id for reminder in pending_reminders
+                                if st.session_state[f"reminder_{reminder.id}"]
+                            ]
+                            if completed_ids:
+                                db.query(Reminder).filter(Reminder.id.in_(completed_ids)).update(
+                                    {"is_completed": 1}, synchronize_session=False
+                                )
+                                db.commit()
+                            bump_data_version()
                             st.session_state.reminders_checked = True
                             st.rerun()
                     
@@ -1211,47 +1646,19 @@ def show_reminder_popup():
             else:
                 st.session_state.reminders_checked = True
                 
-        finally:
-            db.close()
-
-def get_exif_orientation(image_path):
-    """Get the EXIF orientation tag from an image"""
-    try:
-        image = Image.open(image_path)
-        if hasattr(image, '_getexif'):  # Check if image has EXIF data
-            exif = image._getexif()
-            if exif:
-                # Find the orientation tag (274 is the standard tag for orientation)
-                for tag_id in PIL.ExifTags.TAGS:
-                    if PIL.ExifTags.TAGS[tag_id] == 'Orientation':
-                        orientation = exif.get(tag_id)
-                        return orientation
-    except:
-        pass
-    return 1  # Default orientation if no EXIF data found
 
 def fix_image_orientation(image_path):
     """Fix image orientation based on EXIF data and save the corrected image"""
     try:
-        image = Image.open(image_path)
-        if hasattr(image, '_getexif'):  # Check if image has EXIF data
-            orientation = get_exif_orientation(image_path)
+        with Image.open(image_path) as image:
+            # Most uploads are already upright; leave those files untouched
+            # rather than paying for a lossy decode and re-encode
+            if image.getexif().get(PIL.ExifTags.Base.Orientation, 1) == 1:
+                return
             
-            # Rotate or flip based on EXIF orientation tag
-            if orientation == 2:
-                image = image.transpose(Image.FLIP_LEFT_RIGHT)
-            elif orientation == 3:
-                image = image.transpose(Image.ROTATE_180)
-            elif orientation == 4:
-                image = image.transpose(Image.FLIP_TOP_BOTTOM)
-            elif orientation == 5:
-                image = image.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.ROTATE_90)
-            elif orientation == 6:
-                image = image.transpose(Image.ROTATE_270)
-            elif orientation == 7:
-                image = image.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.ROTATE_270)
-            elif orientation == 8:
-                image = image.transpose(Image.ROTATE_90)
+            # Pillow applies whichever rotate/flip the orientation tag asks for
+            # in one pass, and drops the tag from the returned image's EXIF
+            image = ImageOps.exif_transpose(image)
             
             # Save the corrected image
             image.save(image_path, quality=95, exif=image.info.get('exif'))
@@ -1259,22 +1666,40 @@ def fix_image_orientation(image_path):
     except Exception as e:
         print(f"Error fixing image orientation: {str(e)}")
 
+def write_upload(uploaded_file, file_path):
+    """Write an uploaded file to disk without copying it through Python buffers"""
+    with open(file_path, "wb", buffering=0) as f:
+        if hasattr(uploaded_file, 'getbuffer'):
+            # Streamlit keeps uploads in memory (BytesIO), so there is no file
+            # descriptor for sendfile; hand the buffer straight to write()
+            view = uploaded_file.getbuffer()
+            try:
+                written = 0
+                while written < len(view):
+                    written += f.write(view[written:])
+            finally:
+                view.release()
+        else:
+            uploaded_file.seek(0)
+            shutil.copyfileobj(uploaded_file, f, length=1 << 20)
+
 def save_uploaded_image(uploaded_file):
     """Save uploaded image to the images directory with orientation correction"""
-    image_dir = os.path.join('data', 'images')
-    os.makedirs(image_dir, exist_ok=True)
-    
-    # Add microseconds to ensure unique filenames
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    unique_id = str(uuid.uuid4())
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    file_path = store_uploaded_image(uploaded_file)
+    list_image_dir.clear()
+    return file_path
+
+def store_uploaded_image(uploaded_file):
+    """Write one upload into IMAGE_DIR (which must already exist) and fix its orientation"""
+    # A random uuid alone keeps names unique, even across concurrent saves
     file_extension = os.path.splitext(uploaded_file.name)[1]
-    filename = f"tree_{timestamp}_{unique_id}{file_extension}"
+    filename = f"tree_{uuid.uuid4().hex}{file_extension}"
     
-    file_path = os.path.join(image_dir, filename)
+    file_path = os.path.join(IMAGE_DIR, filename)
     
     # Save the original uploaded file
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    write_upload(uploaded_file, file_path)
     
     # Fix the orientation
     fix_image_orientation(file_path)
@@ -1283,20 +1708,20 @@ def save_uploaded_image(uploaded_file):
 
 def save_uploaded_logo(uploaded_file):
     """Save uploaded logo to the images directory with orientation correction"""
-    logo_dir = os.path.join('data', 'system')
-    os.makedirs(logo_dir, exist_ok=True)
+    os.makedirs(LOGO_DIR, exist_ok=True)
     
     file_extension = os.path.splitext(uploaded_file.name)[1]
     filename = f"logo{file_extension}"
-    file_path = os.path.join(logo_dir, filename)
+    file_path = os.path.join(LOGO_DIR, filename)
     
     # Save the original uploaded file
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    write_upload(uploaded_file, file_path)
     
     # Fix the orientation
     fix_image_orientation(file_path)
     
+    # The logo keeps its name, so drop the listing that holds its old mtime
+    list_image_dir.clear()
     return file_path
 
 def get_or_create_settings(db):
@@ -1305,22 +1730,29 @@ def get_or_create_settings(db):
     if not settings:
         settings = Settings(
             app_title="Bonsai Tracker",
-            sidebar_image="C:\\Users\\loudo\\Desktop\\Bonsai Design\\Screenshot+2020-01-29+at+10.52.32+AM.png"
+            sidebar_image=DEFAULT_LOGO_PATH
         )
         db.add(settings)
         db.commit()
     return settings
 
+@st.cache_data
+def get_sidebar_branding():
+    """Get the profile title and logo path shown in the sidebar, cached until settings are saved"""
+    with session_scope() as db:
+        settings = get_or_create_settings(db)
+        return settings.app_title, settings.sidebar_image
+
 def show_settings_form():
     """Display and handle the settings form"""
+    st.button(":material/arrow_back: Back to Collection", on_click=set_page, args=("View Trees",))
     
     col1, col2, col3 = st.columns([1, 10, 5])
         
     with col2:
         st.header("Customize Profile")
         
-        db = SessionLocal()
-        try:
+        with session_scope() as db:
             settings = get_or_create_settings(db)
             
             
@@ -1354,12 +1786,14 @@ def show_settings_form():
                                 settings.sidebar_image = logo_path
                             
                             db.commit()
+                            get_sidebar_branding.clear()
                             st.success("Settings updated successfully!")
                             st.session_state.page = "View Trees"
                             st.rerun()
                             
                         except Exception as e:
                             st.error(f"Error saving settings: {str(e)}")
+                            db.rollback()
                         
                 
                                     # Function to confirm action
@@ -1425,8 +1859,6 @@ def show_settings_form():
                             st.rerun()
 
 
-        finally:
-            db.close()
 
 def show_species_notes():
     """
@@ -1443,9 +1875,7 @@ def show_species_notes():
     }
 </style>
 """, unsafe_allow_html=True)
-    if st.button(":material/arrow_back: Back to Collection"):
-        st.session_state.page = "View Trees"
-        st.rerun()
+    st.button(":material/arrow_back: Back to Collection", on_click=set_page, args=("View Trees",))
     
     st.header("Species Notes")
     # Add new species button
@@ -1470,109 +1900,111 @@ def show_species_notes():
                 cancel = st.form_submit_button("Cancel")
             
             if submit and species_name:
-                db = SessionLocal()
-                try:
-                    # Check if species already exists
-                    existing = db.query(Species).filter(Species.name == species_name).first()
-                    if existing:
-                        st.error(f"Species '{species_name}' already exists.")
-                    else:
-                        new_species = Species(name=species_name, notes=species_notes)
-                        db.add(new_species)
-                        db.commit()
-                        st.success(f"Species '{species_name}' added successfully!")
-                        st.session_state.show_add_species = False
-                        st.rerun()
-                except Exception as e:
-                    st.error(f"Error adding species: {str(e)}")
-                finally:
-                    db.close()
+                with session_scope() as db:
+                    try:
+                        # Check if species already exists
+                        existing = db.query(Species).filter(Species.name == species_name).first()
+                        if existing:
+                            st.error(f"Species '{species_name}' already exists.")
+                        else:
+                            new_species = Species(name=species_name, notes=species_notes)
+                            db.add(new_species)
+                            db.commit()
+                            get_species_ids.clear()
+                            st.success(f"Species '{species_name}' added successfully!")
+                            st.session_state.show_add_species = False
+                            st.rerun()
+                    except Exception as e:
+                        st.error(f"Error adding species: {str(e)}")
+                        db.rollback()
             
             if cancel:
                 st.session_state.show_add_species = False
                 st.rerun()
     
     # Display species list
-    db = SessionLocal()
-    try:
-        species_list = db.query(Species).order_by(Species.name).all()
+    with session_scope() as db:
+        try:
+            species_list = db.query(Species).order_by(Species.name).all()
         
-        if not species_list:
-            st.info("No species have been added yet. Click 'Add New Species' to get started.")
-        else:
-            for species in species_list:
+            if not species_list:
+                st.info("No species have been added yet. Click 'Add New Species' to get started.")
+            else:
+                for species in species_list:
                 
-                with st.expander(f"{species.name}", expanded=False):
+                    with st.expander(f"{species.name}", expanded=False):
                     
-                    # Check if there are trees using this species
-                    tree_count = db.query(Tree).filter(Tree.species_id == species.id).count()
-                    if tree_count > 0:
-                        st.info(f"This species is used by {tree_count} tree{'s' if tree_count > 1 else ''} in your collection.")
+                        # Check if there are trees using this species
+                        tree_count = db.query(Tree).filter(Tree.species_id == species.id).count()
+                        if tree_count > 0:
+                            st.info(f"This species is used by {tree_count} tree{'s' if tree_count > 1 else ''} in your collection.")
                     
-                    # Display formatted notes
-                    if species.notes:
-                        st.markdown(species.notes)
-                    else:
-                        st.info("No notes available for this species.")
-                    button_cols = st.columns([1, 1])
+                        # Display formatted notes
+                        if species.notes:
+                            st.markdown(species.notes)
+                        else:
+                            st.info("No notes available for this species.")
+                        button_cols = st.columns([1, 1])
                     
-                    with button_cols[0]:
-                        if st.button("",icon=":material/edit:", key=f"edit_{species.id}", help="Edit Species Notes"):
-                            st.session_state.selected_species = species.id
-                            st.session_state.page = "Edit Species"
-                            st.rerun()
+                        with button_cols[0]:
+                            if st.button("",icon=":material/edit:", key=f"edit_{species.id}", help="Edit Species Notes"):
+                                st.session_state.selected_species = species.id
+                                st.session_state.page = "Edit Species"
+                                st.rerun()
                     
-                    with button_cols[1]:
-                        if st.button("", icon=":material/delete:", key=f"delete_{species.id}", help="Delete Species"):
-                            st.session_state.delete_species_id = species.id
-                            st.session_state.delete_species_name = species.name
-                            st.session_state.show_delete_confirmation = True
-                            st.rerun()
+                        with button_cols[1]:
+                            if st.button("", icon=":material/delete:", key=f"delete_{species.id}", help="Delete Species"):
+                                st.session_state.delete_species_id = species.id
+                                st.session_state.delete_species_name = species.name
+                                st.session_state.show_delete_confirmation = True
+                                st.rerun()
                                        
             
 
-            # Show species notes if one is selected
-            if st.session_state.get("selected_species"):
-                selected = db.query(Species).filter(Species.id == st.session_state.selected_species).first()
+                # Show species notes if one is selected
+                if st.session_state.get("selected_species"):
+                    selected = db.get(Species, st.session_state.selected_species)
 
         
-        # Delete confirmation dialog
-        if st.session_state.get("show_delete_confirmation", False):
-            with st.container():
-                st.warning(f"Are you sure you want to delete '{st.session_state.delete_species_name}'?")
+            # Delete confirmation dialog
+            if st.session_state.get("show_delete_confirmation", False):
+                with st.container():
+                    st.warning(f"Are you sure you want to delete '{st.session_state.delete_species_name}'?")
                 
-                # Check if this species is used by any trees
-                tree_count = db.query(Tree).filter(Tree.species_id == st.session_state.delete_species_id).count()
-                if tree_count > 0:
-                    st.error(f"This species is used by {tree_count} tree{'s' if tree_count > 1 else ''} in your collection. You cannot delete it until you reassign those trees to different species.")
-                    if st.button("Cancel", key="cancel_delete"):
-                        st.session_state.show_delete_confirmation = False
-                        st.rerun()
-                else:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("Yes, Delete", key="confirm_delete"):
-                            try:
-                                species_to_delete = db.query(Species).filter(Species.id == st.session_state.delete_species_id).first()
-                                if species_to_delete:
-                                    db.delete(species_to_delete)
-                                    db.commit()
-                                    st.session_state.show_delete_confirmation = False
-                                    if st.session_state.get("selected_species") == st.session_state.delete_species_id:
-                                        st.session_state.selected_species = None
-                                    st.success(f"Species '{st.session_state.delete_species_name}' deleted successfully!")
-                                    st.rerun()
-                            except Exception as e:
-                                st.error(f"Error deleting species: {str(e)}")
-                    with col2:
+                    # Check if this species is used by any trees
+                    tree_count = db.query(Tree).filter(Tree.species_id == st.session_state.delete_species_id).count()
+                    if tree_count > 0:
+                        st.error(f"This species is used by {tree_count} tree{'s' if tree_count > 1 else ''} in your collection. You cannot delete it until you reassign those trees to different species.")
                         if st.button("Cancel", key="cancel_delete"):
                             st.session_state.show_delete_confirmation = False
                             st.rerun()
+                    else:
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            if st.button("Yes, Delete", key="confirm_delete"):
+                                try:
+                                    species_to_delete = db.get(Species, st.session_state.delete_species_id)
+                                    if species_to_delete:
+                                        db.delete(species_to_delete)
+                                        db.commit()
+                                        get_species_ids.clear()
+                                        bump_data_version()
+                                        st.session_state.show_delete_confirmation = False
+                                        if st.session_state.get("selected_species") == st.session_state.delete_species_id:
+                                            st.session_state.selected_species = None
+                                        st.success(f"Species '{st.session_state.delete_species_name}' deleted successfully!")
+                                        st.rerun()
+                                except Exception as e:
+                                    st.error(f"Error deleting species: {str(e)}")
+                                    db.rollback()
+                        with col2:
+                            if st.button("Cancel", key="cancel_delete"):
+                                st.session_state.show_delete_confirmation = False
+                                st.rerun()
                             
-    except Exception as e:
-        st.error(f"Error loading species: {str(e)}")
-    finally:
-        db.close()
+        except Exception as e:
+            st.error(f"Error loading species: {str(e)}")
+            db.rollback()
 
 def show_edit_species_form(species_id):
     """Display the form to edit a species"""
@@ -1587,237 +2019,242 @@ def show_edit_species_form(species_id):
                 }
             </style>
             """, unsafe_allow_html=True)
-    db = SessionLocal()
-    try:
-        species = db.query(Species).filter(Species.id == species_id).first()
-        if not species:
-            st.error("Species not found")
-            if st.button("Back to Species Notes"):
-                st.session_state.page = "Species Notes"
-                st.rerun()
-            return
+    with session_scope() as db:
+        try:
+            species = db.get(Species, species_id)
+            if not species:
+                st.error("Species not found")
+                if st.button("Back to Species Notes"):
+                    st.session_state.page = "Species Notes"
+                    st.rerun()
+                return
         
-        st.header(f"Edit {species.name}")
+            st.header(f"Edit {species.name}")
         
-        # Back button
-        if st.button("← Back to Species Notes"):
-            st.session_state.page = "Species Notes"
-            st.rerun()
+            # Back button
+            if st.button("← Back to Species Notes"):
+                st.session_state.page = "Species Notes"
+                st.rerun()
         
-        with st.form("edit_species_form"):
-            species_name = st.text_input("Species Name", value=species.name)
+            with st.form("edit_species_form"):
+                species_name = st.text_input("Species Name", value=species.name)
             
-            species_notes = st.text_area("Species Notes (Markdown supported)", 
-                                        value=species.notes or "", 
-                                        height=400)
+                species_notes = st.text_area("Species Notes (Markdown supported)", 
+                                            value=species.notes or "", 
+                                            height=400)
             
-            col1, col2 = st.columns(2)
-            with col1:
-                submit = st.form_submit_button("",icon=":material/save:", help="Save Changes")
-            with col2:
-                cancel = st.form_submit_button(":material/close:", help="Cancel")
+                col1, col2 = st.columns(2)
+                with col1:
+                    submit = st.form_submit_button("",icon=":material/save:", help="Save Changes")
+                with col2:
+                    cancel = st.form_submit_button(":material/close:", help="Cancel")
             
-            if submit:
-                if not species_name:
-                    st.error("Species name cannot be empty")
-                else:
-                    try:
-                        # Check if the name already exists (for a different species)
-                        existing = db.query(Species).filter(
-                            Species.name == species_name, 
-                            Species.id != species.id
-                        ).first()
+                if submit:
+                    if not species_name:
+                        st.error("Species name cannot be empty")
+                    else:
+                        try:
+                            # Check if the name already exists (for a different species)
+                            existing = db.query(Species).filter(
+                                Species.name == species_name, 
+                                Species.id != species.id
+                            ).first()
                         
-                        if existing:
-                            st.error(f"Species '{species_name}' already exists.")
-                        else:
-                            species.name = species_name
-                            species.notes = species_notes
-                            db.commit()
-                            st.success("Species updated successfully!")
-                            # Go back to species notes page
-                            st.session_state.page = "Species Notes"
-                            st.rerun()
-                    except Exception as e:
-                        st.error(f"Error updating species: {str(e)}")
+                            if existing:
+                                st.error(f"Species '{species_name}' already exists.")
+                            else:
+                                species.name = species_name
+                                species.notes = species_notes
+                                db.commit()
+                                get_species_ids.clear()
+                                bump_data_version()
+                                st.success("Species updated successfully!")
+                                # Go back to species notes page
+                                st.session_state.page = "Species Notes"
+                                st.rerun()
+                        except Exception as e:
+                            st.error(f"Error updating species: {str(e)}")
+                            db.rollback()
             
-            if cancel:
-                st.session_state.page = "Species Notes"
-                st.rerun()
+                if cancel:
+                    st.session_state.page = "Species Notes"
+                    st.rerun()
         
-    except Exception as e:
-        st.error(f"Error loading species: {str(e)}")
-    finally:
-        db.close()
+        except Exception as e:
+            st.error(f"Error loading species: {str(e)}")
+            db.rollback()
+
+def get_image_bytes(image_path):
+    """Read an image file's bytes, cached until the file is modified"""
+    mtime = get_file_mtime(image_path)
+    if mtime is None:
+        # Written since the directory was last listed
+        mtime = os.path.getmtime(image_path)
+    return read_image_bytes(image_path, mtime)
+
+@st.cache_data
+def read_image_bytes(image_path, mtime):
+    """Read an image file's bytes (cached per path and modification time)"""
+    with open(image_path, 'rb') as f:
+        return f.read()
+
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'style.css')
+
+FONT_LINK = '<link href="https://fonts.googleapis.com/css2?family=Kdam+Thmor+Pro&family=Roboto:wght@500&display=swap" rel="stylesheet">'
+
+@st.cache_resource
+def get_css():
+    """Build the stylesheet and font link markup once per process"""
+    with open(CSS_PATH) as f:
+        return f'{FONT_LINK}<style>{f.read()}</style>'
+
+@st.fragment
+def show_export_button():
+    """Export toggle and download, rerun on their own instead of with the whole page"""
+    if state_button("Export Data", key="export", use_container_width=True):
+        with st.spinner("Preparing export..."):
+            try:
+                with session_scope() as db:
+                    export_path = export_bonsai_data(db)
+            
+                # Create download button
+                with open(export_path, "rb") as f:
+                    st.download_button(
+                        label="Download Export",
+                        data=f,
+                        file_name=os.path.basename(export_path),
+                        mime="application/zip",
+                        key="download_export"
+                    )
+            
+                # Clean up zip file after download button is created
+                os.remove(export_path)
+            
+            except Exception as e:
+                st.error(f"Export failed: {str(e)}")
+
+def show_collection():
+    """Display the grid of active tree cards"""
+    st.header("Bonsai Collection")
+
+    st.button("",icon=":material/add:", help="Add New Tree", on_click=set_page, args=("Add New Tree",))
+
+    # Reuse the last load until something is written
+    data_version = get_write_counter()['version']
+    trees, photo_paths, page, page_count = load_tree_cards(
+        data_version, st.session_state.get('tree_page', 0)
+    )
+    st.session_state.tree_page = page
+    
+    if trees:
+        # Create grid layout, filling each column in one pass
+        col_count = 3
+        cols = st.columns(col_count)
+        for col, column_trees in zip(cols, (trees[i::col_count] for i in range(col_count))):
+            with col:
+                for tree in column_trees:
+                    with st.container():
+                        create_tree_card(tree, photo_paths.get(tree.id), tree.latest_update)
+    
+    # Page navigation
+    if page_count > 1:
+        nav_cols = st.columns([1, 2, 1])
+        with nav_cols[0]:
+            st.button("Previous", key="tree_page_prev", disabled=page == 0, use_container_width=True,
+                      on_click=set_state, args=("tree_page", page - 1))
+        with nav_cols[1]:
+            st.markdown(f"<p style='text-align: center'>Page {page + 1} of {page_count}</p>", unsafe_allow_html=True)
+        with nav_cols[2]:
+            st.button("Next", key="tree_page_next", disabled=page == page_count - 1, use_container_width=True,
+                      on_click=set_state, args=("tree_page", page + 1))
+        
+        # Load the next page in the background so Next is served from cache,
+        # once per page and data version rather than on every rerun
+        prefetched = get_prefetched_pages()
+        if page < page_count - 1 and (data_version, page + 1) not in prefetched:
+            # Pages queued for an older version will never be asked for again
+            prefetched.difference_update([key for key in list(prefetched) if key[0] != data_version])
+            prefetched.add((data_version, page + 1))
+            get_prefetch_executor().submit(prefetch_tree_page, data_version, page + 1)
+
+# Page name -> (render function, session state key of its argument or None)
+PAGES = {
+    "View Trees": (show_collection, None),
+    "Settings": (show_settings_form, None),
+    "Species Notes": (show_species_notes, None),
+    "Edit Species": (show_edit_species_form, "selected_species"),
+    "Graveyard": (show_graveyard_trees, None),
+    "Add New Tree": (show_add_tree_form, None),
+    "Update Tree": (show_update_form, "selected_tree"),
+    "Tree Gallery": (show_tree_gallery, "selected_tree"),
+    "Edit Tree": (show_edit_tree_form, "selected_tree"),
+    "Work History": (show_work_history, "selected_tree"),
+}
+
+def show_page(page):
+    """Render the given page, if it exists and has what it needs selected"""
+    render, arg_key = PAGES.get(page, (None, None))
+    if render is None:
+        return
+    if arg_key is None:
+        render()
+    elif st.session_state[arg_key]:
+        render(st.session_state[arg_key])
 
 def main():
-    st.set_page_config(page_title="Bonsai Tracker", layout="wide", initial_sidebar_state="auto")
+    # One session is shared by everything rendered during this rerun
+    with session_scope():
+        st.set_page_config(page_title="Bonsai Tracker", layout="wide", initial_sidebar_state="auto")
     
-    with open('C:\\Users\\loudo\\Desktop\\bonsai-tracker\\src\\style.css') as f:
-        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+        # Stylesheet and button font in a single element
+        st.markdown(get_css(), unsafe_allow_html=True)
     
-    # Initialize session state
-    if 'page' not in st.session_state:
-        st.session_state.page = "View Trees"
-    if 'selected_tree' not in st.session_state:
-        st.session_state.selected_tree = None
-    if 'selected_species' not in st.session_state:
-        st.session_state.selected_species = None
+        # Initialize session state
+        if 'page' not in st.session_state:
+            st.session_state.page = "View Trees"
+        if 'selected_tree' not in st.session_state:
+            st.session_state.selected_tree = None
+        if 'selected_species' not in st.session_state:
+            st.session_state.selected_species = None
     
-    show_reminder_popup()
+        show_reminder_popup()
     
-    # Sidebar
-    with st.sidebar:
-        db = SessionLocal()
-        try:
-            settings = get_or_create_settings(db)
-            
+        # Sidebar
+        with st.sidebar:
+            title, sidebar_image = get_sidebar_branding()
+        
             # Add Settings button to sidebar
-            if st.button("⚙️", key="settings"):
-                st.session_state.page = "Settings"
-                st.rerun()
-            
+            st.button("⚙️", key="settings", on_click=set_page, args=("Settings",))
+        
             # Use custom title
-            st.header(settings.app_title)
-            
-            # Use custom logo if it exists and is valid
-            if settings.sidebar_image and os.path.exists(settings.sidebar_image):
-                st.image(settings.sidebar_image, use_container_width=True)
+            st.header(title)
+        
+            # Use custom logo if it exists and is valid. The sidebar never shows
+            # it large, so send a cached thumbnail rather than the full upload
+            if sidebar_image and os.path.exists(sidebar_image):
+                st.image(get_image_bytes(get_thumbnail(sidebar_image)), use_container_width=True)
             else:
                 # Fallback to default logo
-                st.image("C:\\Users\\loudo\\Desktop\\Bonsai Design\\Screenshot+2020-01-29+at+10.52.32+AM.png", width=125)
-            
+                st.image(get_image_bytes(get_thumbnail(DEFAULT_LOGO_PATH)), width=125)
+        
             # Create a container to push buttons to the bottom
             with st.container():
                 st.markdown('<div class="footer">', unsafe_allow_html=True)
-                
+            
                 # Add Species Notes button
                 if st.session_state.page != "Species Notes":
-                    if st.button("Species Notes", use_container_width=True, key="species_notes"):
-                        st.session_state.page = "Species Notes"
-                        st.rerun()
-                
+                    st.button("Species Notes", use_container_width=True, key="species_notes", on_click=set_page, args=("Species Notes",))
+            
                 # Replace radio with a button for archived trees
                 if st.session_state.page != "Graveyard":
-                    if st.button("Graveyard", use_container_width=True, key="arkive"):
-                        st.session_state.page = "Graveyard"
-                        st.rerun()
-                
+                    st.button("Graveyard", use_container_width=True, key="arkive", on_click=set_page, args=("Graveyard",))
+            
                 # Add export button to sidebar
-                if state_button("Export Data", key="export", use_container_width=True):
-                    with st.spinner("Preparing export..."):
-                        try:
-                            db = SessionLocal()
-                            export_path = export_bonsai_data(db)
-                            
-                            # Create download button
-                            with open(export_path, "rb") as f:
-                                st.download_button(
-                                    label="Download Export",
-                                    data=f,
-                                    file_name=os.path.basename(export_path),
-                                    mime="application/zip",
-                                    key="download_export"
-                                )
-                            
-                            # Clean up zip file after download button is created
-                            os.remove(export_path)
-                            
-                        except Exception as e:
-                            st.error(f"Export failed: {str(e)}")
-                        finally:
-                            db.close()
+                show_export_button()
                 st.markdown('</div>', unsafe_allow_html=True)
-        finally:
-            db.close()
             
-    if st.session_state.page == "Settings":
-        if st.button(":material/arrow_back: Back to Collection"):
-            st.session_state.page = "View Trees"
-            st.rerun()
-        show_settings_form()    
-
-    # Main content
-    if st.session_state.page == "View Trees":
-        st.header("Bonsai Collection")
-        
-        if st.button("",icon=":material/add:", help="Add New Tree"):
-            st.session_state.page = "Add New Tree"
-            st.rerun()
-        
-        db = SessionLocal()
-        try:
-            # Query trees with their latest update dates
-            trees_with_updates = (
-                db.query(
-                    Tree,
-                    # Get the most recent update date for each tree
-                    func.max(TreeUpdate.update_date).label('latest_update')
-                )
-                .outerjoin(TreeUpdate)  # Outer join to include trees with no updates
-                .filter(Tree.is_archived == 0)
-                .group_by(Tree.id)
-                .order_by(
-                    # Sort by latest update date descending, nulls last
-                    func.coalesce(func.max(TreeUpdate.update_date), 
-                                datetime(1900, 1, 1)).desc()
-                )
-                .all()
-            )
-            
-            # Extract just the tree objects in the correct order
-            trees = [tree for tree, _ in trees_with_updates]
-            
-            if trees:
-                # Create grid layout
-                col_count = 3
-                cols = st.columns(col_count)
-                for idx, tree in enumerate(trees):
-                    with cols[idx % col_count]:
-                        with st.container():
-                            create_tree_card(tree, db)
-        finally:
-            db.close()
-    
-    elif st.session_state.page == "Species Notes":
-        show_species_notes()
-    
-    elif st.session_state.page == "Edit Species" and st.session_state.selected_species:
-        show_edit_species_form(st.session_state.selected_species)
-    
-    elif st.session_state.page == "Graveyard":
-        # Add back button at the top
-        if st.button(":material/arrow_back: Back to Collection"):
-            st.session_state.page = "View Trees"
-            st.rerun()
-            
-        show_graveyard_trees()
-    
-    elif st.session_state.page == "Add New Tree":
-        # Add "Back to Collection" button at the top
-        if st.button(":material/arrow_back: Back to Collection"):
-            st.session_state.page = "View Trees"
-            st.rerun()
-            
-        st.header("Add New Tree")
-        show_add_tree_form()
-    
-    elif st.session_state.page == "Update Tree" and st.session_state.selected_tree:
-        show_update_form(st.session_state.selected_tree)
-    
-    elif st.session_state.page == "Tree Gallery" and st.session_state.selected_tree:
-        show_tree_gallery(st.session_state.selected_tree)
-    
-    elif st.session_state.page == "Edit Tree" and st.session_state.selected_tree:
-        show_edit_tree_form(st.session_state.selected_tree)
-        
-    elif st.session_state.page == "Work History" and st.session_state.selected_tree:
-        show_work_history(st.session_state.selected_tree)
-        
-    #button font
-    st.markdown("""
-    <link href="https://fonts.googleapis.com/css2?family=Kdam+Thmor+Pro&family=Roboto:wght@500&display=swap" rel="stylesheet">
-    """, unsafe_allow_html=True)
+        # Main content
+        show_page(st.session_state.page)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
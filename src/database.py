@@ -1,6 +1,8 @@
 # src/database.py
 import os
-from sqlalchemy import create_engine
+import threading
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from .models import Base
 
@@ -12,11 +14,38 @@ DB_PATH = os.path.join(DATA_DIR, 'bonsai.db')
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # Create database engine
-engine = create_engine(f'sqlite:///{DB_PATH}')
+# Streamlit reruns issue the same handful of statements over and over, so keep
+# a roomy compiled-statement cache. Reruns also happen on different threads.
+engine = create_engine(
+    f'sqlite:///{DB_PATH}',
+    query_cache_size=1200,
+    connect_args={'check_same_thread': False}
+)
+
+@event.listens_for(engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection.
+
+    WAL lets reruns keep reading while a form submit is writing, and
+    synchronous=NORMAL is safe under WAL while avoiding an fsync per commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MB
+    cursor.close()
 
 # Create all tables
 Base.metadata.create_all(engine)
 
+# create_all() only builds indexes together with new tables, so add any
+# indexes introduced after an existing database was created
+for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
 # Create session factory
 SessionLocal = sessionmaker(bind=engine)
 
@@ -26,4 +55,26 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+_local = threading.local()
+
+@contextmanager
+def session_scope():
+    """Share one session across nested scopes on the current thread.
+
+    Streamlit runs each rerun of the script on a single thread, so opening a
+    scope at the top of the rerun lets every page and helper reuse the same
+    session. Only the outermost scope closes it.
+    """
+    session = getattr(_local, 'session', None)
+    if session is not None:
+        yield session
+        return
+    
+    session = _local.session = SessionLocal()
+    try:
+        yield session
+    finally:
+        _local.session = None
+        session.close()
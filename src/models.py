@@ -1,6 +1,6 @@
 # src/models.py
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index, text
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -37,11 +37,16 @@ class Tree(Base):
     notes = Column(Text)
     is_archived = Column(Integer, default=0)  # 0 = active, 1 = archived
     
+    # Lets the collection page find active trees without scanning the archived ones
+    __table_args__ = (
+        Index('ix_trees_active', 'id', sqlite_where=text('is_archived = 0')),
+    )
     
     # Relationships
     species_info = relationship("Species", back_populates="trees")
-    updates = relationship("TreeUpdate", back_populates="tree", cascade="all, delete-orphan")
-    photos = relationship("Photo", back_populates="tree", cascade="all, delete-orphan")
+    # Insertion order, which is the order the export has always written these in
+    updates = relationship("TreeUpdate", back_populates="tree", cascade="all, delete-orphan", order_by="TreeUpdate.id")
+    photos = relationship("Photo", back_populates="tree", cascade="all, delete-orphan", order_by="Photo.id")
     reminders = relationship("Reminder", back_populates="tree", cascade="all, delete-orphan")
     
     @property
@@ -65,6 +70,11 @@ class TreeUpdate(Base):
     girth = Column(Float)  # in cm
     work_performed = Column(Text, nullable=False)
     
+    # Serves "latest update per tree" lookups without a sort
+    __table_args__ = (
+        Index('ix_tree_updates_tree_id_update_date', 'tree_id', 'update_date'),
+    )
+    
     # Relationships
     tree = relationship("Tree", back_populates="updates")
 
@@ -79,6 +89,12 @@ class Photo(Base):
     description = Column(Text)
     is_starred = Column(Integer, default=0)  # New column: 0 = not starred, 1 = starred
     
+    # Serve per-tree photo lists by date and the starred-or-newest card photo
+    __table_args__ = (
+        Index('ix_photos_tree_id_photo_date', 'tree_id', 'photo_date'),
+        Index('ix_photos_tree_id_is_starred_photo_date', 'tree_id', 'is_starred', 'photo_date'),
+    )
+    
     # Relationships
     tree = relationship("Tree", back_populates="photos")
 
@@ -93,5 +109,10 @@ class Reminder(Base):
     notification_sent = Column(Integer, default=0)
     created_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     
+    # Serves a tree's pending reminders in date order
+    __table_args__ = (
+        Index('ix_reminders_tree_id_is_completed_reminder_date', 'tree_id', 'is_completed', 'reminder_date'),
+    )
+    
     # Relationships
     tree = relationship("Tree", back_populates="reminders")
\ No newline at end of file